@@ -3,8 +3,1215 @@ import sys
 import sqlite3
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-from datetime import datetime
+from datetime import datetime, timedelta
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from bisect import bisect_right
+import argparse
+import hashlib
+import json
+import math
+import operator
+import queue
+import re
 import shutil
+import threading
+import time
+
+try:
+    from pypinyin import lazy_pinyin
+except ImportError:  # 未安装 pypinyin 时只能通过 GB2312 编码顺序得到常用汉字的首字母
+    lazy_pinyin = None
+
+DEFAULT_TAGS = ["必备", "驱动", "办公", "浏览器", "工具", "安全", "系统"]
+
+SYNC_CHUNK_SIZE = 1024 * 1024
+SYNC_PART_SUFFIX = ".syncpart"
+SYNC_JOURNAL_NAME = ".sync_journal.json"
+MTIME_TOLERANCE = 2  # FAT32/exFAT 的修改时间精度为 2 秒
+
+USAGE_FLUSH_INTERVAL = 1.0
+USAGE_COMPACT_INTERVAL = 300
+USAGE_BATCH_SIZE = 500
+USAGE_MAX_RETRIES = 10  # 连续写入失败这么多次后丢弃积压的事件，避免内存无限增长
+USAGE_FLUSH_TIMEOUT = 0.5  # 界面线程等待后台写入的最长时间
+
+FUZZY_MATCH_RATIO = 0.7  # 容错匹配时查询中至少需要命中的二元组比例
+STALE_POSTINGS_MIN = 1000  # 倒排表中过期条目超过该数量且超过总数的 1/4 时重建
+TYPO_WHOLE_MATCH_LENGTH = 4  # 不超过该长度的查询与整个名称/首字母比较编辑距离，更长的查询在名称中查找
+TYPO_MAX_DIRECT_MATCHES = 20  # 短查询直接匹配的候选少于该数量时才查找输错一处的条目
+SEARCH_KEYS_VERSION = 2  # 拼音键的计算规则变化时递增，使数据库中缓存的键重新计算
+PINYIN_BACKEND = f"{'pypinyin' if lazy_pinyin else 'gb2312'}/{SEARCH_KEYS_VERSION}"
+
+# GB2312 一级汉字按拼音排序，每个首字母对应的起始编码
+_GB2312_INITIALS = [
+    (0xB0A1, "a"), (0xB0C5, "b"), (0xB2C1, "c"), (0xB4EE, "d"), (0xB6EA, "e"), (0xB7A2, "f"),
+    (0xB8C1, "g"), (0xB9FE, "h"), (0xBBF7, "j"), (0xBFA6, "k"), (0xC0AC, "l"), (0xC2E8, "m"),
+    (0xC4C3, "n"), (0xC5B6, "o"), (0xC5BE, "p"), (0xC6DA, "q"), (0xC8BB, "r"), (0xC8F6, "s"),
+    (0xCBFA, "t"), (0xCDDA, "w"), (0xCEF4, "x"), (0xD1B9, "y"), (0xD4D1, "z"),
+]
+_GB2312_INITIAL_CODES = [code for code, _ in _GB2312_INITIALS]
+_GB2312_LEVEL1_END = 0xD7F9
+_HAN_OR_WORD = re.compile(r"([\u4e00-\u9fff]+)|([0-9A-Za-z]+)")
+
+
+def create_database(db_path):
+    first_init = not os.path.exists(db_path)
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    cursor.execute('''CREATE TABLE IF NOT EXISTS software (
+                      id INTEGER PRIMARY KEY,
+                      name TEXT NOT NULL,
+                      filename TEXT NOT NULL,
+                      path TEXT UNIQUE NOT NULL,
+                      description TEXT DEFAULT '',
+                      last_used TEXT,
+                      use_count INTEGER DEFAULT 0
+                    )''')
+
+    cursor.execute('''CREATE TABLE IF NOT EXISTS tags (
+                      id INTEGER PRIMARY KEY,
+                      name TEXT UNIQUE NOT NULL
+                    )''')
+
+    cursor.execute('''CREATE TABLE IF NOT EXISTS software_tags (
+                      software_id INTEGER NOT NULL,
+                      tag_id INTEGER NOT NULL,
+                      PRIMARY KEY (software_id, tag_id),
+                      FOREIGN KEY (software_id) REFERENCES software(id),
+                      FOREIGN KEY (tag_id) REFERENCES tags(id)
+                    )''')
+
+    # 汇总位置按事件 id 记录，必须使用 AUTOINCREMENT，否则删除最大的几行后 id 会被重用
+    cursor.execute('''CREATE TABLE IF NOT EXISTS usage_events (
+                      id INTEGER PRIMARY KEY AUTOINCREMENT,
+                      software_id INTEGER NOT NULL,
+                      used_at TEXT NOT NULL,
+                      FOREIGN KEY (software_id) REFERENCES software(id)
+                    )''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_usage_events_used_at ON usage_events (used_at)")
+
+    cursor.execute('''CREATE TABLE IF NOT EXISTS meta (
+                      key TEXT PRIMARY KEY,
+                      value TEXT
+                    )''')
+
+    cursor.execute('''CREATE TABLE IF NOT EXISTS search_keys (
+                      software_id INTEGER PRIMARY KEY,
+                      name TEXT NOT NULL,
+                      pinyin TEXT NOT NULL,
+                      initials TEXT NOT NULL,
+                      FOREIGN KEY (software_id) REFERENCES software(id)
+                    )''')
+
+    if first_init:
+        for tag in DEFAULT_TAGS:
+            try:
+                cursor.execute("INSERT INTO tags (name) VALUES (?)", (tag,))
+            except sqlite3.IntegrityError:
+                pass
+
+    conn.commit()
+    conn.close()
+
+
+def compact_usage(conn):
+    """把尚未汇总的使用事件累加到 software 表的 use_count/last_used，返回汇总的事件数
+
+    事件本身保留用于历史和趋势查询，已汇总的位置记录在 meta 表中。
+    """
+    cursor = conn.cursor()
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        last_id = compacted_usage_id(cursor)
+        cursor.execute("""
+            SELECT software_id, COUNT(*), MAX(used_at), MAX(id)
+            FROM usage_events
+            WHERE id > ?
+            GROUP BY software_id
+        """, (last_id,))
+        rows = cursor.fetchall()
+        if rows:
+            cursor.executemany("""
+                UPDATE software
+                SET use_count = COALESCE(use_count, 0) + ?, last_used = MAX(COALESCE(last_used, ''), ?)
+                WHERE id = ?
+            """, [(count, used_at, software_id) for software_id, count, used_at, _ in rows])
+            cursor.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('usage_compacted_id', ?)",
+                           (max(row[3] for row in rows),))
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return sum(row[1] for row in rows)
+
+
+def compacted_usage_id(cursor):
+    cursor.execute("SELECT value FROM meta WHERE key='usage_compacted_id'")
+    row = cursor.fetchone()
+    return int(row[0]) if row else 0
+
+
+def pending_usage(cursor):
+    """返回尚未汇总的使用事件 {软件 id: (次数, 最后使用时间)}"""
+    cursor.execute("""
+        SELECT software_id, COUNT(*), MAX(used_at)
+        FROM usage_events
+        WHERE id > ?
+        GROUP BY software_id
+    """, (compacted_usage_id(cursor),))
+    return {software_id: (count, used_at) for software_id, count, used_at in cursor.fetchall()}
+
+
+class UsageLog:
+    """后台批量写入的软件使用记录
+
+    启动软件时只把事件放入队列，由后台线程批量插入 usage_events 表，
+    并定期（以及关闭时）把事件汇总到 software 表的计数中。
+    """
+
+    _STOP = object()
+
+    def __init__(self, db_path, flush_interval=USAGE_FLUSH_INTERVAL, compact_interval=USAGE_COMPACT_INTERVAL,
+                 batch_size=USAGE_BATCH_SIZE):
+        self.db_path = db_path
+        self.flush_interval = flush_interval
+        self.compact_interval = compact_interval
+        self.batch_size = batch_size
+        self.queue = queue.Queue()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="UsageLog", daemon=True)
+        self._thread.start()
+
+    def record(self, software_id, used_at=None):
+        self.queue.put((software_id, used_at or datetime.now().isoformat()))
+
+    def flush(self, timeout=USAGE_FLUSH_TIMEOUT):
+        """等待队列中已有的事件写入数据库，数据库被锁住时最多等待 timeout 秒"""
+        if self._thread is None or not self._thread.is_alive():
+            return False
+        done = threading.Event()
+        self.queue.put(done)
+        return done.wait(timeout)
+
+    def close(self, timeout=10):
+        if self._thread is None:
+            return
+        self.queue.put(self._STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _write(self, conn, batch):
+        try:
+            conn.executemany("INSERT INTO usage_events (software_id, used_at) VALUES (?, ?)", batch)
+            conn.commit()
+            return True
+        except sqlite3.Error:
+            conn.rollback()
+            return False
+
+    def _run(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            compact_usage(conn)
+        except sqlite3.Error:
+            pass
+
+        next_compact = time.monotonic() + self.compact_interval
+        batch = []
+        batch_deadline = 0.0
+        failures = 0
+        while True:
+            timeout = max(0.0, (batch_deadline if batch else next_compact) - time.monotonic())
+            try:
+                item = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if isinstance(item, tuple):
+                if not batch:
+                    batch_deadline = time.monotonic() + self.flush_interval
+                batch.append(item)
+                if len(batch) < self.batch_size:
+                    continue
+
+            # 超时、批次已满、请求刷新或关闭时写入
+            if batch:
+                if self._write(conn, batch):
+                    batch = []
+                    failures = 0
+                else:
+                    failures += 1
+                    if failures >= USAGE_MAX_RETRIES:
+                        batch = []
+                        failures = 0
+                    batch_deadline = time.monotonic() + self.flush_interval
+            if isinstance(item, threading.Event):
+                item.set()
+
+            if item is self._STOP or time.monotonic() >= next_compact:
+                try:
+                    compact_usage(conn)
+                except sqlite3.Error:
+                    pass
+                next_compact = time.monotonic() + self.compact_interval
+            if item is self._STOP:
+                break
+        conn.close()
+
+    def most_used(self, since=None, limit=20):
+        """返回 [(软件 id, 名称, 使用次数, 最后使用时间)]，since 为 ISO 时间字符串，None 表示全部历史
+
+        全部历史按 software 表中已汇总的计数加上未汇总的事件统计，与软件列表中的计数一致；
+        旧版本直接累加的计数和同步时合并过来的计数都没有对应的事件。
+        """
+        self.flush()
+        conn = sqlite3.connect(self.db_path, timeout=1)
+        cursor = conn.cursor()
+        if since is None:
+            cursor.execute("""
+                SELECT s.id, s.name,
+                       COALESCE(s.use_count, 0) + COALESCE(p.uses, 0) AS uses,
+                       MAX(COALESCE(s.last_used, ''), COALESCE(p.last_used, '')) AS last_used
+                FROM software s
+                LEFT JOIN (
+                    SELECT software_id, COUNT(*) AS uses, MAX(used_at) AS last_used
+                    FROM usage_events
+                    WHERE id > ?
+                    GROUP BY software_id
+                ) p ON p.software_id = s.id
+                WHERE COALESCE(s.use_count, 0) + COALESCE(p.uses, 0) > 0
+                ORDER BY uses DESC, last_used DESC
+                LIMIT ?
+            """, (compacted_usage_id(cursor), limit))
+        else:
+            cursor.execute("""
+                SELECT s.id, s.name, COUNT(*) AS uses, MAX(e.used_at) AS last_used
+                FROM usage_events e
+                JOIN software s ON s.id = e.software_id
+                WHERE e.used_at >= ?
+                GROUP BY e.software_id
+                ORDER BY uses DESC, last_used DESC
+                LIMIT ?
+            """, (since, limit))
+        result = cursor.fetchall()
+        conn.close()
+        return result
+
+    def history(self, software_id, limit=50):
+        self.flush()
+        conn = sqlite3.connect(self.db_path, timeout=1)
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT used_at FROM usage_events
+            WHERE software_id=?
+            ORDER BY id DESC
+            LIMIT ?
+        """, (software_id, limit))
+        result = [row[0] for row in cursor.fetchall()]
+        conn.close()
+        return result
+
+
+class SoftwareRecord:
+    """目录中的一条软件记录，使用 __slots__ 以减少大量条目时的内存占用"""
+
+    __slots__ = ("id", "name", "filename", "path", "description", "last_used", "use_count", "tags")
+
+    def __init__(self, software_id, name, filename, path, description, last_used=None, use_count=0, tags=()):
+        self.id = software_id
+        self.name = name
+        self.filename = filename
+        self.path = path
+        self.description = description or ""
+        self.last_used = last_used
+        self.use_count = use_count or 0
+        self.tags = tags
+
+
+def gb2312_initial(char):
+    try:
+        code = int.from_bytes(char.encode("gb2312"), "big")
+    except UnicodeEncodeError:
+        return ""
+    if code < _GB2312_INITIAL_CODES[0] or code > _GB2312_LEVEL1_END:
+        return ""
+    return _GB2312_INITIALS[bisect_right(_GB2312_INITIAL_CODES, code) - 1][1]
+
+
+def pinyin_keys(text):
+    """返回 (全拼, 首字母)，英文单词取首字母，数字和全大写缩写保持原样
+
+    例如 "360安全卫士" -> ("360anquanweishi", "360aqws")，"QQ音乐" -> ("qqyinyue", "qqyy")。
+    没有 pypinyin 时汉字无法转成全拼，含汉字的名称全拼为空，避免只剩英文部分被当作完整全拼匹配。
+    """
+    full = []
+    initials = []
+    full_complete = True
+    for han, word in _HAN_OR_WORD.findall(text):
+        if han:
+            if lazy_pinyin:
+                syllables = lazy_pinyin(han)
+                full.extend(syllables)
+                initials.extend(syllable[:1] for syllable in syllables)
+            else:
+                full_complete = False
+                initials.extend(gb2312_initial(char) for char in han)
+        else:
+            full.append(word.lower())
+            initials.append(word.lower() if word.isdigit() or word.isupper() else word[0].lower())
+    return "".join(full) if full_complete else "", "".join(initials)
+
+
+def compact_text(text):
+    compact = "".join(text.lower().split())
+    # 无需转换时沿用原字符串，避免每条记录多存一份名称和描述
+    return text if compact == text else compact
+
+
+def search_keys(name, description, pinyin):
+    full, initials = pinyin
+    return compact_text(name), full, initials, compact_text(description)
+
+
+class SearchIndex:
+    """软件搜索引擎：名称、拼音全拼和拼音首字母的字符 n-gram 倒排索引
+
+    名称和首字母额外索引单字，全部字段索引二元组；描述较长且只需包含匹配，不进索引而是直接扫描。
+    倒排表用列表只追加，条目修改或删除后旧的记录留在表中，查询时按当前的键重新校验，
+    过期的条目累积到一定数量后整体重建。
+    查询先从倒排索引取出命中足够多二元组的候选，再按匹配质量
+    （完全匹配 > 全拼 > 首字母 > 前缀 > 包含 > 描述 > 编辑距离 1 > 二元组容错）和使用次数排序。
+    """
+
+    def __init__(self):
+        self.keys = {}
+        self.postings = defaultdict(list)
+        self._stale = 0
+        self._description_ids = None
+        self._description_blob = ""
+        self._description_starts = []
+
+    def __len__(self):
+        return len(self.keys)
+
+    @staticmethod
+    def _bigrams(text):
+        return set(map(operator.add, text, text[1:]))
+
+    def _grams(self, keys):
+        name, full, initials, description = keys
+        grams = set(name)
+        grams.update(initials)
+        for text in (name, full, initials):
+            grams.update(map(operator.add, text, text[1:]))
+        return grams
+
+    def _post(self, software_id, keys):
+        postings = self.postings
+        for gram in self._grams(keys):
+            postings[gram].append(software_id)
+
+    def add(self, software_id, keys):
+        old = self.keys.get(software_id)
+        if old == keys:
+            return
+        self.keys[software_id] = keys
+        if keys[3] or (old and old[3]):
+            self._description_ids = None
+        if old is not None:
+            self._retire()
+        self._post(software_id, keys)
+
+    def remove(self, software_id):
+        keys = self.keys.pop(software_id, None)
+        if keys is None:
+            return
+        if keys[3]:
+            self._description_ids = None
+        self._retire()
+
+    def _retire(self):
+        self._stale += 1
+        if self._stale > max(STALE_POSTINGS_MIN, len(self.keys) // 4):
+            self.postings = defaultdict(list)
+            self._stale = 0
+            for software_id, keys in self.keys.items():
+                self._post(software_id, keys)
+
+    def search(self, text, records=None):
+        """返回按相关度排序的软件 id 列表，records 用于读取使用次数"""
+        query = compact_text(text)
+        if not query:
+            return list(self.keys)
+
+        grams = {query} if len(query) == 1 else self._bigrams(query)
+        min_hits = self._min_hits(len(grams))
+        hits = Counter()
+        for gram in grams:
+            ids = self.postings.get(gram)
+            if ids:
+                hits.update(ids)
+        candidates = {software_id for software_id, count in hits.items() if count >= min_hits}
+        candidates.update(self._description_matches(query))
+
+        typo_pattern = None
+        typo_candidates = set()
+        if len(query) >= 2:
+            typo_pattern = self._typo_pattern(query)
+            if len(query) <= TYPO_WHOLE_MATCH_LENGTH:
+                # 直接匹配的结果已经足够多时多半没有输错，省去按单字查找候选
+                if len(candidates) < TYPO_MAX_DIRECT_MATCHES:
+                    typo_candidates = self._short_typo_candidates(query)
+            else:
+                # 一处输入错误最多破坏 3 个二元组
+                typo_candidates = {software_id for software_id, count in hits.items()
+                                   if count >= max(1, len(grams) - 3)}
+            typo_candidates -= candidates
+
+        scored = []
+        for software_id in candidates | typo_candidates:
+            keys = self.keys.get(software_id)
+            if keys is None:
+                continue
+            quality = None
+            if software_id in candidates:
+                quality = self._match_quality(query, grams, keys, min_hits)
+            if (quality is None or quality < 35) and typo_pattern and self._typo_match(typo_pattern, query, keys):
+                quality = 35
+            if quality is None:
+                continue
+            record = records.get(software_id) if records else None
+            if record is not None and record.use_count:
+                quality += min(9.0, math.log2(1 + record.use_count))
+            scored.append((-quality, keys[0], software_id))
+        scored.sort()
+        return [software_id for _, _, software_id in scored]
+
+    def _short_typo_candidates(self, query):
+        # 与查询相差一处的字符串至少包含查询中除一个以外的全部字符，长度最多相差 1
+        chars = set(query)
+        char_hits = Counter()
+        for char in chars:
+            ids = self.postings.get(char)
+            if ids:
+                char_hits.update(ids)
+        min_chars = max(1, len(chars) - 1)
+        shortest, longest = len(query) - 1, len(query) + 1
+        keys = self.keys
+        candidates = set()
+        for software_id, count in char_hits.items():
+            if count < min_chars or software_id not in keys:
+                continue
+            name, full, initials, description = keys[software_id]
+            if shortest <= len(name) <= longest or shortest <= len(initials) <= longest:
+                candidates.add(software_id)
+        return candidates
+
+    def _description_matches(self, query):
+        # 描述拼接成一个字符串（查询中不含换行，不会跨条目匹配），变化后在下次搜索时重建
+        if self._description_ids is None:
+            ids = [software_id for software_id, keys in self.keys.items() if keys[3]]
+            starts = []
+            position = 0
+            for software_id in ids:
+                starts.append(position)
+                position += len(self.keys[software_id][3]) + 1
+            self._description_ids = ids
+            self._description_starts = starts
+            self._description_blob = "\n".join(self.keys[software_id][3] for software_id in ids)
+
+        blob = self._description_blob
+        ids = self._description_ids
+        starts = self._description_starts
+        matches = set()
+        position = blob.find(query)
+        while position != -1:
+            i = bisect_right(starts, position) - 1
+            matches.add(ids[i])
+            position = blob.find(query, starts[i + 1]) if i + 1 < len(starts) else -1
+        return matches
+
+    @staticmethod
+    def _min_hits(gram_count):
+        if gram_count <= 2:
+            return gram_count
+        return min(gram_count - 1, math.ceil(gram_count * FUZZY_MATCH_RATIO))
+
+    @staticmethod
+    def _typo_pattern(query):
+        """匹配与查询相差一处（替换、多打、漏打一个字符或相邻两字符颠倒）的字符串"""
+        escape = re.escape
+        variants = set()
+        for i in range(len(query)):
+            variants.add(escape(query[:i]) + "." + escape(query[i + 1:]))
+            if len(query) > 2:
+                variants.add(escape(query[:i] + query[i + 1:]))
+            if i + 1 < len(query):
+                variants.add(escape(query[:i] + query[i + 1] + query[i] + query[i + 2:]))
+        for i in range(len(query) + 1):
+            variants.add(escape(query[:i]) + "." + escape(query[i:]))
+        return re.compile("(?:" + "|".join(variants) + ")")
+
+    @staticmethod
+    def _typo_match(pattern, query, keys):
+        name, full, initials, description = keys
+        if len(query) <= TYPO_WHOLE_MATCH_LENGTH:
+            # 两个字符的首字母差一处几乎等于任意匹配，首字母只在查询较长时参与
+            fields = (name, initials) if len(query) >= 3 else (name,)
+            return any(pattern.fullmatch(field) for field in fields if field)
+        return any(pattern.search(field) for field in (name, full, initials) if field)
+
+    def _match_quality(self, query, grams, keys, min_hits):
+        name, full, initials, description = keys
+        if name == query:
+            return 100
+        if full == query:
+            return 95
+        if initials == query:
+            return 90
+        if name.startswith(query) or full.startswith(query) or initials.startswith(query):
+            return 80
+        if query in name or query in full or query in initials:
+            return 60
+        if query in description:
+            return 40
+        if len(query) < 2:
+            return None
+        # 容错匹配：同一字段内命中足够多的二元组
+        best = max(len(grams & self._bigrams(field)) for field in (name, full, initials))
+        if best < min_hits:
+            return None
+        return 30 * best / len(grams)
+
+
+class CatalogModel:
+    """内存中的软件目录，启动时从数据库加载一次，之后每次写入数据库都会同步更新并通知订阅的视图
+
+    事件类型:
+        reset  - 整体重新加载
+        add    - 新增软件，ids 为新增的软件 id
+        update - 软件信息或标签变化，ids 为受影响的软件 id
+        tags   - 标签增删，ids 为标签被移除的软件 id
+    """
+
+    def __init__(self, db_path, usage_log=None):
+        self.db_path = db_path
+        self.usage_log = usage_log
+        self.records = {}
+        self.order = []
+        self.row_index = {}
+        self.tags = []
+        self.tag_ids = {}
+        self.search_index = SearchIndex()
+        self._listeners = []
+
+    def __len__(self):
+        return len(self.order)
+
+    def __iter__(self):
+        records = self.records
+        return (records[software_id] for software_id in self.order)
+
+    def subscribe(self, callback):
+        self._listeners.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _notify(self, event, ids=()):
+        for callback in list(self._listeners):
+            callback(event, ids)
+
+    def load(self):
+        if self.usage_log is not None:
+            self.usage_log.flush()
+
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        # 在同一个读事务中读取计数和未汇总的事件，避免与后台汇总交错
+        cursor.execute("BEGIN")
+
+        cursor.execute("SELECT id, name FROM tags ORDER BY name")
+        tag_names = {tag_id: sys.intern(name) for tag_id, name in cursor.fetchall()}
+
+        tags_by_software = {}
+        cursor.execute("SELECT software_id, tag_id FROM software_tags")
+        for software_id, tag_id in cursor.fetchall():
+            name = tag_names.get(tag_id)
+            if name is not None:
+                tags_by_software.setdefault(software_id, []).append(name)
+
+        cursor.execute("""
+            SELECT id, name, filename, path, description, last_used, use_count
+            FROM software ORDER BY id
+        """)
+        rows = cursor.fetchall()
+        usage = pending_usage(cursor)
+
+        cursor.execute("SELECT value FROM meta WHERE key='pinyin_backend'")
+        backend = cursor.fetchone()
+        reset = not backend or backend[0] != PINYIN_BACKEND
+
+        # 重新加载时沿用已有的索引，只有新增或名称、描述变化的条目需要更新
+        search_index = self.search_index
+        previous = self.records
+        changed = []
+        for software_id, name, filename, path, description, last_used, use_count in rows:
+            old = previous.get(software_id)
+            if (reset or old is None or software_id not in search_index.keys
+                    or old.name != name or old.description != (description or "")):
+                changed.append(software_id)
+
+        cached_keys = {}
+        if changed and not reset:
+            cursor.execute("SELECT software_id, name, pinyin, initials FROM search_keys")
+            cached_keys = {row[0]: row[1:] for row in cursor.fetchall()}
+        conn.close()
+
+        records = {}
+        for software_id, name, filename, path, description, last_used, use_count in rows:
+            tags = tags_by_software.get(software_id)
+            if software_id in usage:
+                count, used_at = usage[software_id]
+                use_count = (use_count or 0) + count
+                last_used = max(last_used or "", used_at)
+            records[software_id] = SoftwareRecord(
+                software_id, name, filename, path, description, last_used, use_count,
+                tuple(sorted(tags)) if tags else ()
+            )
+
+        # 拼音键预先计算并缓存在数据库中，只有新条目或名称变化的条目需要重新计算
+        stale_keys = []
+        for software_id in changed:
+            record = records[software_id]
+            cached = cached_keys.get(software_id)
+            if cached is not None and cached[0] == record.name:
+                pinyin = cached[1:]
+            else:
+                pinyin = pinyin_keys(record.name)
+                stale_keys.append((record.id, record.name) + pinyin)
+            search_index.add(record.id, search_keys(record.name, record.description, pinyin))
+        for software_id in [software_id for software_id in search_index.keys if software_id not in records]:
+            search_index.remove(software_id)
+        if stale_keys or reset:
+            self._save_search_keys(stale_keys, reset=reset)
+
+        self.records = records
+        self.order = list(records)
+        self.row_index = {software_id: i for i, software_id in enumerate(self.order)}
+        self.tags = list(tag_names.values())
+        self.tag_ids = {name: tag_id for tag_id, name in tag_names.items()}
+        self._notify("reset")
+
+    def get(self, software_id):
+        return self.records.get(software_id)
+
+    def paths(self):
+        return {record.path for record in self.records.values()}
+
+    def _save_search_keys(self, rows, reset=False, cursor=None):
+        conn = None
+        if cursor is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            cursor = conn.cursor()
+        if reset:
+            cursor.execute("DELETE FROM search_keys")
+        cursor.executemany("INSERT OR REPLACE INTO search_keys (software_id, name, pinyin, initials) VALUES (?, ?, ?, ?)",
+                           rows)
+        cursor.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('pinyin_backend', ?)", (PINYIN_BACKEND,))
+        if conn is not None:
+            conn.commit()
+            conn.close()
+
+    def _index_record(self, record, pinyin):
+        self.search_index.add(record.id, search_keys(record.name, record.description, pinyin))
+
+    def filter(self, search_text="", active_tags=None):
+        """有搜索词时按相关度排序，否则按目录顺序返回"""
+        active_tags = set(active_tags or ())
+        if search_text:
+            records = [self.records[software_id] for software_id in self.search_index.search(search_text, self.records)]
+        else:
+            records = self
+        if not active_tags:
+            return list(records)
+        return [record for record in records if not active_tags.isdisjoint(record.tags)]
+
+    def _append_record(self, record):
+        self.records[record.id] = record
+        self.row_index[record.id] = len(self.order)
+        self.order.append(record.id)
+
+    def add_software(self, name, filename, path, description=""):
+        return self.add_software_batch([(name, filename, path, description)])[0]
+
+    def add_software_batch(self, rows):
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        added = []
+        key_rows = []
+        try:
+            for name, filename, path, description in rows:
+                cursor.execute("""
+                    INSERT INTO software (name, filename, path, description)
+                    VALUES (?, ?, ?, ?)
+                """, (name, filename, path, description))
+                added.append(SoftwareRecord(cursor.lastrowid, name, filename, path, description))
+                key_rows.append((cursor.lastrowid, name) + pinyin_keys(name))
+            self._save_search_keys(key_rows, cursor=cursor)
+            conn.commit()
+        finally:
+            conn.close()
+
+        for record, keys in zip(added, key_rows):
+            self._append_record(record)
+            self._index_record(record, keys[2:])
+        if added:
+            self._notify("add", tuple(record.id for record in added))
+        return added
+
+    def update_software(self, software_id, name, description):
+        pinyin = pinyin_keys(name)
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute("""
+            UPDATE software
+            SET name=?, description=?
+            WHERE id=?
+        """, (name, description, software_id))
+        self._save_search_keys([(software_id, name) + pinyin], cursor=cursor)
+        conn.commit()
+        conn.close()
+
+        record = self.records.get(software_id)
+        if record is not None:
+            record.name = name
+            record.description = description
+            self._index_record(record, pinyin)
+            self._notify("update", (software_id,))
+
+    def record_use(self, software_id):
+        last_used = datetime.now().isoformat()
+        if self.usage_log is not None:
+            self.usage_log.record(software_id, last_used)
+        else:
+            conn = sqlite3.connect(self.db_path)
+            conn.execute("INSERT INTO usage_events (software_id, used_at) VALUES (?, ?)", (software_id, last_used))
+            conn.commit()
+            conn.close()
+
+        record = self.records.get(software_id)
+        if record is not None:
+            record.use_count += 1
+            record.last_used = last_used
+            self._notify("update", (software_id,))
+
+    def set_software_tags(self, software_id, tags):
+        tags = tuple(sorted(sys.intern(tag) for tag in tags if tag in self.tag_ids))
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        try:
+            cursor.execute("DELETE FROM software_tags WHERE software_id=?", (software_id,))
+            cursor.executemany("INSERT INTO software_tags (software_id, tag_id) VALUES (?, ?)",
+                               [(software_id, self.tag_ids[tag]) for tag in tags])
+            conn.commit()
+        finally:
+            conn.close()
+
+        record = self.records.get(software_id)
+        if record is not None:
+            record.tags = tags
+            self._notify("update", (software_id,))
+
+    def add_tag(self, name):
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        try:
+            cursor.execute("INSERT INTO tags (name) VALUES (?)", (name,))
+            conn.commit()
+            tag_id = cursor.lastrowid
+        finally:
+            conn.close()
+
+        name = sys.intern(name)
+        self.tag_ids[name] = tag_id
+        self.tags.append(name)
+        self.tags.sort()
+        self._notify("tags")
+
+    def delete_tag(self, name):
+        tag_id = self.tag_ids.get(name)
+        if tag_id is None:
+            return False
+
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM software_tags WHERE tag_id=?", (tag_id,))
+        cursor.execute("DELETE FROM tags WHERE id=?", (tag_id,))
+        conn.commit()
+        conn.close()
+
+        del self.tag_ids[name]
+        self.tags.remove(name)
+        affected = []
+        for record in self.records.values():
+            if name in record.tags:
+                record.tags = tuple(tag for tag in record.tags if tag != name)
+                affected.append(record.id)
+        self._notify("tags", tuple(affected))
+        return True
+
+
+class ManifestEntry:
+    """清单中的一个文件：大小、修改时间及可选的哈希值"""
+
+    __slots__ = ("size", "mtime", "hash")
+
+    def __init__(self, size, mtime, file_hash=None):
+        self.size = size
+        self.mtime = mtime
+        self.hash = file_hash
+
+
+def file_hash(path):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(SYNC_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def build_manifest(root_dir, with_hash=False):
+    """递归扫描目录，返回 (文件清单, 目录集合)，键为使用 "/" 分隔的相对路径"""
+    files = {}
+    dirs = set()
+    pending = [("", root_dir)]
+    while pending:
+        rel_dir, full_dir = pending.pop()
+        with os.scandir(full_dir) as entries:
+            for entry in entries:
+                rel = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    dirs.add(rel)
+                    pending.append((rel, entry.path))
+                elif entry.is_file() and not entry.name.endswith(SYNC_PART_SUFFIX):
+                    st = entry.stat()
+                    files[rel] = ManifestEntry(st.st_size, st.st_mtime, file_hash(entry.path) if with_hash else None)
+    return files, dirs
+
+
+def manifest_entry_changed(source, target):
+    if target is None or source.size != target.size:
+        return True
+    if source.hash is not None and target.hash is not None:
+        return source.hash != target.hash
+    return abs(source.mtime - target.mtime) > MTIME_TOLERANCE
+
+
+def is_same_directory(path, other):
+    try:
+        return os.path.samefile(path, other)
+    except OSError:
+        return os.path.normcase(os.path.abspath(path)) == os.path.normcase(os.path.abspath(other))
+
+
+def find_part_files(root_dir):
+    parts = []
+    for dirpath, dirnames, filenames in os.walk(root_dir):
+        for filename in filenames:
+            if filename.endswith(SYNC_PART_SUFFIX):
+                parts.append(os.path.join(dirpath, filename))
+    return parts
+
+
+def merge_catalog(source_db, target_db, delete_extraneous=False):
+    """将源目录的软件信息合并到目标数据库，返回 (新增数, 更新数, 删除数)
+
+    合并规则（按 path 匹配同一软件）:
+        名称、描述 - 源中非空时以源（主U盘）为准
+        标签       - 取并集，目标中缺少的标签会自动创建
+        使用次数   - 先汇总两边的使用事件，再取较大值，最后使用时间取较晚者，重复同步结果不变
+        多余条目   - 仅在 delete_extraneous 时删除源中不存在的条目
+    """
+    create_database(source_db)
+    create_database(target_db)
+
+    src_conn = sqlite3.connect(source_db, timeout=30)
+    compact_usage(src_conn)
+    src_cursor = src_conn.cursor()
+    src_cursor.execute("""
+        SELECT st.software_id, t.name
+        FROM software_tags st
+        JOIN tags t ON t.id = st.tag_id
+    """)
+    source_tags = {}
+    for software_id, tag in src_cursor.fetchall():
+        source_tags.setdefault(software_id, set()).add(tag)
+    src_cursor.execute("SELECT id, name, filename, path, description, last_used, use_count FROM software")
+    source_rows = src_cursor.fetchall()
+    src_conn.close()
+
+    conn = sqlite3.connect(target_db, timeout=30)
+    compact_usage(conn)
+    cursor = conn.cursor()
+    added = updated = removed = 0
+    try:
+        cursor.execute("SELECT name, id FROM tags")
+        tag_ids = dict(cursor.fetchall())
+        cursor.execute("SELECT path, id, name, description, last_used, use_count FROM software")
+        target_rows = {row[0]: row[1:] for row in cursor.fetchall()}
+
+        for source_id, name, filename, path, description, last_used, use_count in source_rows:
+            tags = source_tags.get(source_id, set())
+            for tag in tags - tag_ids.keys():
+                cursor.execute("INSERT INTO tags (name) VALUES (?)", (tag,))
+                tag_ids[tag] = cursor.lastrowid
+
+            existing = target_rows.get(path)
+            if existing is None:
+                cursor.execute("""
+                    INSERT INTO software (name, filename, path, description, last_used, use_count)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, (name, filename, path, description or "", last_used, use_count or 0))
+                target_id = cursor.lastrowid
+                added += 1
+            before = conn.total_changes
+            if existing is not None:
+                target_id, old_name, old_description, old_last_used, old_use_count = existing
+                old_values = (old_name, old_description or "", old_last_used, old_use_count or 0)
+                new_values = (
+                    name or old_name,
+                    description or old_values[1],
+                    max(filter(None, (last_used, old_last_used)), default=None),
+                    max(use_count or 0, old_values[3]),
+                )
+                if new_values != old_values:
+                    cursor.execute("""
+                        UPDATE software
+                        SET name=?, description=?, last_used=?, use_count=?
+                        WHERE id=?
+                    """, new_values + (target_id,))
+
+            cursor.executemany("INSERT OR IGNORE INTO software_tags (software_id, tag_id) VALUES (?, ?)",
+                               [(target_id, tag_ids[tag]) for tag in tags])
+            if existing is not None and conn.total_changes != before:
+                updated += 1
+
+        if delete_extraneous:
+            source_paths = {row[3] for row in source_rows}
+            extra_ids = [(row[0],) for path, row in target_rows.items() if path not in source_paths]
+            cursor.executemany("DELETE FROM software_tags WHERE software_id=?", extra_ids)
+            cursor.executemany("DELETE FROM usage_events WHERE software_id=?", extra_ids)
+            cursor.executemany("DELETE FROM search_keys WHERE software_id=?", extra_ids)
+            cursor.executemany("DELETE FROM software WHERE id=?", extra_ids)
+            removed = len(extra_ids)
+
+        conn.commit()
+    finally:
+        conn.close()
+    return added, updated, removed
+
+
+class SyncReport:
+    __slots__ = ("files_copied", "bytes_copied", "bytes_resumed", "files_deleted", "elapsed",
+                 "catalog_added", "catalog_updated", "catalog_removed", "cancelled")
+
+    def __init__(self):
+        self.files_copied = 0
+        self.bytes_copied = 0
+        self.bytes_resumed = 0
+        self.files_deleted = 0
+        self.elapsed = 0.0
+        self.catalog_added = 0
+        self.catalog_updated = 0
+        self.catalog_removed = 0
+        self.cancelled = False
+
+    @property
+    def throughput(self):
+        return self.bytes_copied / self.elapsed if self.elapsed > 0 else 0.0
+
+    def summary(self):
+        lines = [
+            "同步已中断，再次同步将从中断处继续" if self.cancelled else "同步完成",
+            f"复制文件: {self.files_copied} 个, {self.bytes_copied / 1024 / 1024:.1f} MB"
+            + (f" (续传跳过 {self.bytes_resumed / 1024 / 1024:.1f} MB)" if self.bytes_resumed else ""),
+            f"删除文件: {self.files_deleted} 个",
+            f"软件信息: 新增 {self.catalog_added}, 更新 {self.catalog_updated}, 删除 {self.catalog_removed}",
+            f"耗时: {self.elapsed:.1f} 秒, 速度: {self.throughput / 1024 / 1024:.1f} MB/s",
+        ]
+        return "\n".join(lines)
+
+
+class LibrarySync:
+    """按清单差异将本U盘的软件库增量同步到另一个U盘
+
+    只复制新增或变化的文件，文件按块并行复制到临时文件后再替换，
+    中断后再次同步会根据目标中的日志从已复制的位置继续，续传的文件替换前先与源文件比对哈希。
+    """
+
+    def __init__(self, source_root, target_root, with_hash=False, delete_extraneous=False,
+                 merge=True, workers=4, progress=None):
+        self.source_dir = os.path.join(source_root, "Software")
+        self.target_dir = os.path.join(target_root, "Software")
+        self.source_db = os.path.join(source_root, "software.db")
+        self.target_db = os.path.join(target_root, "software.db")
+        self.journal_path = os.path.join(target_root, SYNC_JOURNAL_NAME)
+        self.with_hash = with_hash
+        self.delete_extraneous = delete_extraneous
+        self.merge = merge
+        self.workers = max(1, workers)
+        self.progress = progress
+        self.cancel_event = threading.Event()
+        self._lock = threading.Lock()
+        self._done_bytes = 0
+        self._total_bytes = 0
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def plan(self):
+        source_files, source_dirs = build_manifest(self.source_dir, self.with_hash)
+        if os.path.isdir(self.target_dir):
+            target_files, target_dirs = build_manifest(self.target_dir, self.with_hash)
+        else:
+            target_files, target_dirs = {}, set()
+
+        copies = [rel for rel, entry in source_files.items() if manifest_entry_changed(entry, target_files.get(rel))]
+        deletions = [rel for rel in target_files if rel not in source_files] if self.delete_extraneous else []
+        extra_dirs = [rel for rel in target_dirs if rel not in source_dirs] if self.delete_extraneous else []
+        return source_files, source_dirs, copies, deletions, extra_dirs
+
+    def _load_journal(self):
+        try:
+            with open(self.journal_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _report_progress(self, transferred, rel):
+        with self._lock:
+            self._done_bytes += transferred
+            done = self._done_bytes
+        if self.progress:
+            self.progress(done, self._total_bytes, rel)
+
+    def _copy_file(self, rel, entry, journal_entry):
+        src = os.path.join(self.source_dir, rel)
+        dst = os.path.join(self.target_dir, rel)
+        part = dst + SYNC_PART_SUFFIX
+        if self.cancel_event.is_set():
+            return 0, 0, False
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+
+        # 只有日志记录的源文件版本与当前一致时才续传，否则重新复制。
+        # U盘在写入时被拔出，FAT/exFAT 上临时文件末尾可能是垃圾数据，所以回退一块再续传
+        offset = 0
+        if journal_entry == [entry.size, entry.mtime] and os.path.exists(part):
+            offset = min(os.path.getsize(part), entry.size) // SYNC_CHUNK_SIZE * SYNC_CHUNK_SIZE
+            offset = max(0, offset - SYNC_CHUNK_SIZE)
+
+        copied, finished = self._copy_range(src, part, offset, rel)
+        if finished and offset and file_hash(src) != file_hash(part):
+            # 续传的文件与源文件不一致，丢弃已有部分重新完整复制
+            self._report_progress(-(offset + copied), rel)
+            offset = 0
+            more, finished = self._copy_range(src, part, 0, rel)
+            copied += more
+        if not finished:
+            return copied, offset, False
+
+        shutil.copystat(src, part)
+        os.replace(part, dst)
+        return copied, offset, True
+
+    def _copy_range(self, src, part, offset, rel):
+        """从 offset 处把源文件复制到临时文件，返回 (复制字节数, 是否完成)"""
+        copied = 0
+        finished = True
+        with open(src, "rb") as fsrc, open(part, "r+b" if offset else "wb") as fdst:
+            fdst.truncate(offset)
+            fdst.seek(offset)
+            fsrc.seek(offset)
+            if offset:
+                self._report_progress(offset, rel)
+            while not self.cancel_event.is_set():
+                chunk = fsrc.read(SYNC_CHUNK_SIZE)
+                if not chunk:
+                    break
+                fdst.write(chunk)
+                copied += len(chunk)
+                self._report_progress(len(chunk), rel)
+            else:
+                finished = False
+            # 写入的数据落盘后，下次续传才能把它们算作已复制
+            fdst.flush()
+            os.fsync(fdst.fileno())
+        return copied, finished
+
+    def run(self):
+        report = SyncReport()
+        start = time.perf_counter()
+
+        source_files, source_dirs, copies, deletions, extra_dirs = self.plan()
+
+        os.makedirs(self.target_dir, exist_ok=True)
+        for rel in sorted(source_dirs):
+            os.makedirs(os.path.join(self.target_dir, rel), exist_ok=True)
+
+        previous_journal = self._load_journal()
+        journal = {rel: [source_files[rel].size, source_files[rel].mtime] for rel in copies}
+        with open(self.journal_path, "w", encoding="utf-8") as f:
+            json.dump(journal, f)
+
+        self._done_bytes = 0
+        self._total_bytes = sum(source_files[rel].size for rel in copies)
+
+        # 大文件优先，避免最后只剩一个大文件单线程复制
+        copies.sort(key=lambda rel: source_files[rel].size, reverse=True)
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = [executor.submit(self._copy_file, rel, source_files[rel], previous_journal.get(rel))
+                       for rel in copies]
+            try:
+                for future in futures:
+                    copied, resumed, finished = future.result()
+                    report.bytes_copied += copied
+                    report.bytes_resumed += resumed
+                    report.files_copied += finished
+            except BaseException:
+                # 出错或被中断时让其余线程尽快停止，已复制的部分保留用于续传
+                self.cancel_event.set()
+                raise
+
+        if self.cancel_event.is_set():
+            report.cancelled = True
+            report.elapsed = time.perf_counter() - start
+            return report
+
+        for rel in deletions:
+            os.remove(os.path.join(self.target_dir, rel))
+            report.files_deleted += 1
+        for rel in sorted(extra_dirs, key=lambda p: p.count("/"), reverse=True):
+            try:
+                os.rmdir(os.path.join(self.target_dir, rel))
+            except OSError:
+                pass
+
+        for path in find_part_files(self.target_dir):
+            os.remove(path)
+        os.remove(self.journal_path)
+
+        if self.merge and os.path.exists(self.source_db):
+            report.catalog_added, report.catalog_updated, report.catalog_removed = merge_catalog(
+                self.source_db, self.target_db, self.delete_extraneous)
+
+        report.elapsed = time.perf_counter() - start
+        return report
 
 
 class SoftwareManager:
@@ -25,13 +1232,31 @@ class SoftwareManager:
             os.makedirs(self.software_dir)
 
         self.initialize_database()
-        self.create_ui()
+        self.usage_log = UsageLog(self.db_path)
+        self.usage_log.start()
+        self.catalog = CatalogModel(self.db_path, self.usage_log)
+        self.catalog.load()
+        self.scan_software_directory()
 
         self.sort_ascending = True  # 软件名称排序顺序，默认升序
 
+        self.create_ui()
+
+        # 各视图订阅目录模型，标签过滤条需先于列表更新
+        self.catalog.subscribe(self.on_catalog_filter_changed)
+        self.catalog.subscribe(self.on_catalog_tree_changed)
+        self.catalog.subscribe(self.on_catalog_tags_list_changed)
+        self.catalog.subscribe(self.on_catalog_detail_changed)
+
         self.refresh_tags_ui()
         self.refresh_software_list()
 
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
+    def on_close(self):
+        self.usage_log.close()
+        self.root.destroy()
+
     def set_default_font(self):
         style = ttk.Style()
         style.configure("TLabel", font=("Segoe UI", 9))
@@ -40,43 +1265,7 @@ class SoftwareManager:
         style.configure("Treeview", font=("Segoe UI", 9))
 
     def initialize_database(self):
-        first_init = not os.path.exists(self.db_path)
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        cursor.execute('''CREATE TABLE IF NOT EXISTS software (
-                          id INTEGER PRIMARY KEY,
-                          name TEXT NOT NULL,
-                          filename TEXT NOT NULL,
-                          path TEXT UNIQUE NOT NULL,
-                          description TEXT DEFAULT '',
-                          last_used TEXT,
-                          use_count INTEGER DEFAULT 0
-                        )''')
-
-        cursor.execute('''CREATE TABLE IF NOT EXISTS tags (
-                          id INTEGER PRIMARY KEY,
-                          name TEXT UNIQUE NOT NULL
-                        )''')
-
-        cursor.execute('''CREATE TABLE IF NOT EXISTS software_tags (
-                          software_id INTEGER NOT NULL,
-                          tag_id INTEGER NOT NULL,
-                          PRIMARY KEY (software_id, tag_id),
-                          FOREIGN KEY (software_id) REFERENCES software(id),
-                          FOREIGN KEY (tag_id) REFERENCES tags(id)
-                        )''')
-
-        if first_init:
-            default_tags = ["必备", "驱动", "办公", "浏览器", "工具", "安全", "系统"]
-            for tag in default_tags:
-                try:
-                    cursor.execute("INSERT INTO tags (name) VALUES (?)", (tag,))
-                except sqlite3.IntegrityError:
-                    pass
-
-        conn.commit()
-        conn.close()
+        create_database(self.db_path)
 
     def create_ui(self):
         main_frame = ttk.Frame(self.root)
@@ -104,12 +1293,18 @@ class SoftwareManager:
         toolbar = ttk.Frame(self.software_tab)
         toolbar.pack(fill=tk.X, pady=(0, 10))
 
-        refresh_btn = ttk.Button(toolbar, text="刷新列表", command=self.refresh_software_list)
+        refresh_btn = ttk.Button(toolbar, text="刷新列表", command=self.reload_catalog)
         refresh_btn.pack(side=tk.LEFT, padx=5)
 
         add_btn = ttk.Button(toolbar, text="添加软件", command=self.add_software)
         add_btn.pack(side=tk.LEFT, padx=5)
 
+        sync_btn = ttk.Button(toolbar, text="同步到U盘", command=self.open_sync_dialog)
+        sync_btn.pack(side=tk.LEFT, padx=5)
+
+        stats_btn = ttk.Button(toolbar, text="使用统计", command=self.show_usage_stats)
+        stats_btn.pack(side=tk.LEFT, padx=5)
+
         filter_outer_frame = ttk.LabelFrame(toolbar, text="标签过滤")
         filter_outer_frame.pack(side=tk.LEFT, padx=10, pady=2, fill=tk.X, expand=True)
 
@@ -129,13 +1324,8 @@ class SoftwareManager:
 
         canvas.create_window((0, 0), window=self.tag_filter_frame, anchor="nw")
 
-        self.all_tags = self.get_all_tags()
         self.tag_vars = {}
-        for tag in self.all_tags:
-            var = tk.BooleanVar(value=False)
-            cb = ttk.Checkbutton(self.tag_filter_frame, text=tag, variable=var, command=self.refresh_software_list)
-            cb.pack(side=tk.LEFT, padx=4, pady=5)
-            self.tag_vars[tag] = var
+        self.sync_tag_filter()
 
         all_btn = ttk.Button(filter_outer_frame, text="全部", command=self.clear_tag_filter)
         all_btn.pack(side=tk.LEFT, padx=5, pady=2)
@@ -265,110 +1455,96 @@ class SoftwareManager:
         self.sort_ascending = not getattr(self, "sort_ascending", True)
         self.refresh_software_list()
 
-    def refresh_software_list(self):
+    def reload_catalog(self):
         self.scan_software_directory()
+        self.catalog.load()
+        self.update_status(f"已加载 {len(self.catalog)} 个软件")
+
+    def refresh_software_list(self):
+        selected = self.tree.selection()
 
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        self.tree.delete(*self.tree.get_children())
 
-        search_text = self.search_var.get().strip().lower()
+        search_text = self.search_var.get().strip()
         active_tags = [tag for tag, var in self.tag_vars.items() if var.get()]
 
-        software_list = self.get_software_list(search_text, active_tags)
+        software_list = self.catalog.filter(search_text, active_tags)
 
-        software_list.sort(key=lambda x: x[1].lower(), reverse=not self.sort_ascending)
+        # 有搜索词时保持相关度顺序
+        if not search_text:
+            software_list.sort(key=lambda x: x.name.lower(), reverse=not self.sort_ascending)
 
-        for sw in software_list:
-            tags = self.get_tags_for_software(sw[0])
-            self.tree.insert("", "end", values=(
-                sw[1],
-                sw[4],
-                ", ".join(tags)
-            ), iid=f"sw_{sw[0]}")
+        for record in software_list:
+            self.tree.insert("", "end", values=self.software_tree_values(record), iid=f"sw_{record.id}")
 
         self.update_status(f"已加载 {len(software_list)} 个软件")
-        self.clear_selection_detail()
 
-    def scan_software_directory(self):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        if selected and self.tree.exists(selected[0]):
+            self.tree.selection_set(selected[0])
+        else:
+            self.clear_selection_detail()
+
+    def software_tree_values(self, record):
+        return record.name, record.description, ", ".join(record.tags)
 
-        cursor.execute("SELECT path FROM software")
-        existing_paths = {row[0] for row in cursor.fetchall()}
+    def software_matches_tags(self, record):
+        active_tags = [tag for tag, var in self.tag_vars.items() if var.get()]
+        return not active_tags or not set(active_tags).isdisjoint(record.tags)
+
+    def on_catalog_tree_changed(self, event, ids):
+        # 搜索结果按相关度排序，信息变化可能改变顺序，此时直接重建列表
+        if event == "update" and not self.search_var.get().strip():
+            for software_id in ids:
+                record = self.catalog.get(software_id)
+                iid = f"sw_{software_id}"
+                # 名称变化会影响排序，过滤结果变化会影响可见性，这两种情况需要重建列表
+                if (record is None or not self.tree.exists(iid) or not self.software_matches_tags(record)
+                        or self.tree.set(iid, "name") != record.name):
+                    break
+                self.tree.item(iid, values=self.software_tree_values(record))
+            else:
+                return
+        self.refresh_software_list()
+
+    def on_catalog_filter_changed(self, event, ids):
+        if event in ("reset", "tags"):
+            self.sync_tag_filter()
+
+    def sync_tag_filter(self):
+        tags = set(self.catalog.tags)
+
+        for child in self.tag_filter_frame.winfo_children():
+            if isinstance(child, ttk.Checkbutton) and child.cget("text") not in tags:
+                child.destroy()
+        for tag in [tag for tag in self.tag_vars if tag not in tags]:
+            del self.tag_vars[tag]
+
+        for tag in self.catalog.tags:
+            if tag not in self.tag_vars:
+                var = tk.BooleanVar(value=False)
+                cb = ttk.Checkbutton(self.tag_filter_frame, text=tag, variable=var, command=self.refresh_software_list)
+                cb.pack(side=tk.LEFT, padx=4, pady=5)
+                self.tag_vars[tag] = var
+
+    def scan_software_directory(self):
+        existing_paths = self.catalog.paths()
+        new_rows = []
 
         entries = os.listdir(self.software_dir)
         for entry in entries:
             full_entry_path = os.path.join(self.software_dir, entry)
             rel_path = entry
-            if rel_path in existing_paths:
+            if rel_path in existing_paths or entry.endswith(SYNC_PART_SUFFIX):
                 continue
             if os.path.isfile(full_entry_path):
                 name = os.path.splitext(entry)[0]
-                cursor.execute("""
-                    INSERT INTO software (name, filename, path, description)
-                    VALUES (?, ?, ?, ?)
-                """, (name, entry, rel_path, ""))
+                new_rows.append((name, entry, rel_path, ""))
             elif os.path.isdir(full_entry_path):
                 name = entry
-                cursor.execute("""
-                    INSERT INTO software (name, filename, path, description)
-                    VALUES (?, ?, ?, ?)
-                """, (name, "", rel_path, ""))
-        conn.commit()
-        conn.close()
+                new_rows.append((name, "", rel_path, ""))
 
-    def get_software_list(self, search_text="", active_tags=None):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        query = "SELECT id, name, filename, path, description FROM software"
-        params = []
-
-        if search_text:
-            query += " WHERE (LOWER(name) LIKE ? OR LOWER(description) LIKE ?)"
-            params.extend([f"%{search_text}%", f"%{search_text}%"])
-
-        if active_tags:
-            tag_ids = []
-            for tag in active_tags:
-                cursor.execute("SELECT id FROM tags WHERE name=?", (tag,))
-                result = cursor.fetchone()
-                if result:
-                    tag_ids.append(result[0])
-
-            if tag_ids:
-                placeholders = ",".join("?" * len(tag_ids))
-                if "WHERE" in query:
-                    query += f" AND id IN (SELECT software_id FROM software_tags WHERE tag_id IN ({placeholders}))"
-                else:
-                    query += f" WHERE id IN (SELECT software_id FROM software_tags WHERE tag_id IN ({placeholders}))"
-                params.extend(tag_ids)
-
-        cursor.execute(query, params)
-        result = cursor.fetchall()
-        conn.close()
-        return result
-
-    def get_all_tags(self):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("SELECT name FROM tags ORDER BY name")
-        tags = [row[0] for row in cursor.fetchall()]
-        conn.close()
-        return tags
-
-    def get_tags_for_software(self, software_id):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT t.name
-            FROM tags t
-            JOIN software_tags st ON t.id = st.tag_id
-            WHERE st.software_id=?
-        """, (software_id,))
-        tags = [row[0] for row in cursor.fetchall()]
-        conn.close()
-        return tags
+        if new_rows:
+            self.catalog.add_software_batch(new_rows)
 
     def on_software_select(self, event):
         selected_items = self.tree.selection()
@@ -388,20 +1564,24 @@ class SoftwareManager:
         self.edit_btn.config(state=tk.NORMAL)
         self.manage_tags_btn.config(state=tk.NORMAL)
 
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("SELECT name, path, description FROM software WHERE id=?", (software_id,))
-        result = cursor.fetchone()
-        conn.close()
+        self.show_software_detail(software_id)
 
-        if result:
-            name, path, description = result
-            tags = self.get_tags_for_software(software_id)
+    def show_software_detail(self, software_id):
+        record = self.catalog.get(software_id)
+        if record is None:
+            self.clear_selection_detail()
+            return
 
-            self.detail_vars["名称"].set(name)
-            self.detail_vars["路径"].set(path)
-            self.detail_vars["描述"].set(description)
-            self.detail_vars["标签"].set(", ".join(tags))
+        self.detail_vars["名称"].set(record.name)
+        self.detail_vars["路径"].set(record.path)
+        self.detail_vars["描述"].set(record.description)
+        self.detail_vars["标签"].set(", ".join(record.tags))
+
+    def on_catalog_detail_changed(self, event, ids):
+        if self.selected_software_id is None:
+            return
+        if event == "reset" or self.selected_software_id in ids:
+            self.show_software_detail(self.selected_software_id)
 
     def clear_selection_detail(self):
         self.selected_software_id = None
@@ -418,27 +1598,14 @@ class SoftwareManager:
         if not self.selected_software_id:
             return
 
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("SELECT path FROM software WHERE id=?", (self.selected_software_id,))
-        result = cursor.fetchone()
-        conn.close()
+        record = self.catalog.get(self.selected_software_id)
 
-        if result:
-            path = result[0]
-            full_path = os.path.join(self.software_dir, path)
+        if record:
+            full_path = os.path.join(self.software_dir, record.path)
             try:
                 os.startfile(full_path)
 
-                conn = sqlite3.connect(self.db_path)
-                cursor = conn.cursor()
-                cursor.execute("""
-                    UPDATE software
-                    SET use_count = use_count + 1, last_used = ?
-                    WHERE id = ?
-                """, (datetime.now().isoformat(), self.selected_software_id))
-                conn.commit()
-                conn.close()
+                self.catalog.record_use(record.id)
 
                 self.update_status(f"已启动: {os.path.basename(full_path)}")
             except Exception as e:
@@ -454,17 +1621,14 @@ class SoftwareManager:
         edit_win.transient(self.root)
         edit_win.grab_set()
 
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("SELECT name, description FROM software WHERE id=?", (self.selected_software_id,))
-        res = cursor.fetchone()
-        conn.close()
-        if res is None:
+        record = self.catalog.get(self.selected_software_id)
+        if record is None:
             messagebox.showerror("错误", "软件信息读取失败")
             edit_win.destroy()
             return
 
-        name, description = res
+        software_id = record.id
+        name, description = record.name, record.description
 
         ttk.Label(edit_win, text="软件名称:").pack(anchor=tk.W, padx=10, pady=(10, 0))
         name_var = tk.StringVar(value=name)
@@ -485,17 +1649,8 @@ class SoftwareManager:
             if not new_name:
                 messagebox.showwarning("警告", "软件名称不能为空")
                 return
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute("""
-                UPDATE software
-                SET name=?, description=?
-                WHERE id=?
-            """, (new_name, new_desc, self.selected_software_id))
-            conn.commit()
-            conn.close()
+            self.catalog.update_software(software_id, new_name, new_desc)
 
-            self.refresh_software_list()
             edit_win.destroy()
             self.update_status("软件信息已更新")
 
@@ -530,25 +1685,169 @@ class SoftwareManager:
             messagebox.showerror("错误", f"无法复制文件:\n{str(e)}")
             return
 
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
         rel_path = os.path.relpath(dest_path, self.software_dir)
         name = os.path.splitext(os.path.basename(dest_path))[0]
 
         try:
-            cursor.execute("""
-                INSERT INTO software (name, filename, path, description)
-                VALUES (?, ?, ?, ?)
-            """, (name, os.path.basename(dest_path), rel_path, ""))
-            conn.commit()
+            self.catalog.add_software(name, os.path.basename(dest_path), rel_path, "")
             self.update_status(f"已添加软件: {os.path.basename(dest_path)}")
         except sqlite3.IntegrityError:
             messagebox.showwarning("警告", "该软件已存在")
-        finally:
-            conn.close()
 
-        self.refresh_software_list()
+    def open_sync_dialog(self):
+        sync_win = tk.Toplevel(self.root)
+        sync_win.title("同步软件库")
+        sync_win.geometry("460x320")
+        sync_win.transient(self.root)
+        sync_win.grab_set()
+
+        ttk.Label(sync_win, text="目标U盘目录（程序所在目录）:").pack(anchor=tk.W, padx=10, pady=(10, 0))
+        target_frame = ttk.Frame(sync_win)
+        target_frame.pack(fill=tk.X, padx=10, pady=5)
+        target_var = tk.StringVar()
+        ttk.Entry(target_frame, textvariable=target_var).pack(side=tk.LEFT, fill=tk.X, expand=True)
+
+        def browse():
+            path = filedialog.askdirectory(title="选择目标U盘目录", parent=sync_win)
+            if path:
+                target_var.set(path)
+
+        ttk.Button(target_frame, text="浏览...", command=browse).pack(side=tk.LEFT, padx=(5, 0))
+
+        hash_var = tk.BooleanVar(value=False)
+        delete_var = tk.BooleanVar(value=False)
+        merge_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(sync_win, text="比较文件哈希（更可靠，但较慢）", variable=hash_var).pack(anchor=tk.W, padx=10, pady=2)
+        ttk.Checkbutton(sync_win, text="删除目标中多余的软件文件", variable=delete_var).pack(anchor=tk.W, padx=10, pady=2)
+        ttk.Checkbutton(sync_win, text="合并软件信息（描述、标签、使用记录）", variable=merge_var).pack(anchor=tk.W, padx=10, pady=2)
+
+        progress_var = tk.DoubleVar(value=0)
+        ttk.Progressbar(sync_win, variable=progress_var, maximum=100).pack(fill=tk.X, padx=10, pady=(10, 2))
+        message_var = tk.StringVar(value="就绪")
+        ttk.Label(sync_win, textvariable=message_var).pack(anchor=tk.W, padx=10)
+
+        btn_frame = ttk.Frame(sync_win)
+        btn_frame.pack(fill=tk.X, padx=10, pady=10, side=tk.BOTTOM)
+
+        state = {"sync": None, "start": 0.0}
+        events = queue.Queue()
+
+        def on_progress(done, total, rel):
+            events.put(("progress", done, total, rel))
+
+        def worker(sync):
+            try:
+                events.put(("done", sync.run()))
+            except Exception as e:
+                events.put(("error", e))
+
+        def poll():
+            last_progress = None
+            while True:
+                try:
+                    event = events.get_nowait()
+                except queue.Empty:
+                    break
+                if event[0] == "progress":
+                    last_progress = event
+                    continue
+                state["sync"] = None
+                start_btn.config(state=tk.NORMAL)
+                if event[0] == "done":
+                    report = event[1]
+                    progress_var.set(100 if not report.cancelled else progress_var.get())
+                    message_var.set(report.summary().splitlines()[0])
+                    self.update_status(report.summary().splitlines()[0])
+                    messagebox.showinfo("同步软件库", report.summary(), parent=sync_win)
+                else:
+                    message_var.set("同步失败")
+                    messagebox.showerror("错误", f"同步失败:\n{str(event[1])}", parent=sync_win)
+                return
+
+            if last_progress is not None:
+                _, done, total, rel = last_progress
+                elapsed = time.perf_counter() - state["start"]
+                speed = done / elapsed / 1024 / 1024 if elapsed > 0 else 0
+                progress_var.set(done * 100 / total if total else 100)
+                message_var.set(f"{speed:.1f} MB/s  {rel}")
+            sync_win.after(100, poll)
+
+        def start_sync():
+            target_root = target_var.get().strip()
+            if not target_root or not os.path.isdir(target_root):
+                messagebox.showwarning("警告", "请选择有效的目标目录", parent=sync_win)
+                return
+            if is_same_directory(target_root, self.usb_drive):
+                messagebox.showwarning("警告", "目标目录不能是当前软件库", parent=sync_win)
+                return
+            if delete_var.get() and not messagebox.askyesno(
+                    "确认删除", "将删除目标中本软件库没有的软件文件。\n确定继续吗？", parent=sync_win):
+                return
+
+            sync = LibrarySync(self.usb_drive, target_root, with_hash=hash_var.get(),
+                               delete_extraneous=delete_var.get(), merge=merge_var.get(), progress=on_progress)
+            state["sync"] = sync
+            state["start"] = time.perf_counter()
+            progress_var.set(0)
+            message_var.set("正在比较文件清单...")
+            start_btn.config(state=tk.DISABLED)
+            threading.Thread(target=worker, args=(sync,), daemon=True).start()
+            poll()
+
+        def close():
+            if state["sync"] is not None:
+                if not messagebox.askyesno("中断同步", "同步正在进行，确定中断吗？\n下次同步将从中断处继续。", parent=sync_win):
+                    return
+                state["sync"].cancel()
+                return
+            sync_win.destroy()
+
+        start_btn = ttk.Button(btn_frame, text="开始同步", command=start_sync)
+        start_btn.pack(side=tk.RIGHT, padx=5)
+        ttk.Button(btn_frame, text="关闭", command=close).pack(side=tk.RIGHT)
+        sync_win.protocol("WM_DELETE_WINDOW", close)
+
+    def show_usage_stats(self):
+        stats_win = tk.Toplevel(self.root)
+        stats_win.title("使用统计")
+        stats_win.geometry("480x360")
+        stats_win.transient(self.root)
+
+        periods = {"最近 7 天": 7, "本月": None, "最近 90 天": 90, "全部": 0}
+        top_frame = ttk.Frame(stats_win)
+        top_frame.pack(fill=tk.X, padx=10, pady=(10, 5))
+        ttk.Label(top_frame, text="时间范围:").pack(side=tk.LEFT)
+        period_var = tk.StringVar(value="本月")
+        period_combo = ttk.Combobox(top_frame, textvariable=period_var, values=list(periods),
+                                    state="readonly", width=12)
+        period_combo.pack(side=tk.LEFT, padx=5)
+
+        columns = ("name", "uses", "last_used")
+        stats_tree = ttk.Treeview(stats_win, columns=columns, show="headings")
+        stats_tree.heading("name", text="软件名称")
+        stats_tree.heading("uses", text="使用次数")
+        stats_tree.heading("last_used", text="最后使用")
+        stats_tree.column("name", width=220, anchor="w")
+        stats_tree.column("uses", width=80, anchor="center")
+        stats_tree.column("last_used", width=150, anchor="center")
+        stats_tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
+
+        def load_stats(event=None):
+            days = periods[period_var.get()]
+            now = datetime.now()
+            if days is None:
+                since = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0).isoformat()
+            elif days:
+                since = (now - timedelta(days=days)).isoformat()
+            else:
+                since = None
+
+            stats_tree.delete(*stats_tree.get_children())
+            for software_id, name, uses, last_used in self.usage_log.most_used(since):
+                stats_tree.insert("", "end", values=(name, uses, (last_used or "")[:16].replace("T", " ")))
+
+        period_combo.bind("<<ComboboxSelected>>", load_stats)
+        load_stats()
 
     def clear_tag_filter(self):
         for var in self.tag_vars.values():
@@ -561,29 +1860,50 @@ class SoftwareManager:
 
         self.notebook.select(1)
 
-        software_prefix = f"[{self.selected_software_id}]"
-        for i in range(self.tags_software_list.size()):
-            text = self.tags_software_list.get(i)
-            if text.startswith(software_prefix):
-                self.tags_software_list.selection_clear(0, tk.END)
-                self.tags_software_list.selection_set(i)
-                self.tags_software_list.see(i)
-                self.on_tags_software_select()
-                break
+        i = self.catalog.row_index.get(self.selected_software_id)
+        if i is not None:
+            self.tags_software_list.selection_clear(0, tk.END)
+            self.tags_software_list.selection_set(i)
+            self.tags_software_list.see(i)
+            self.on_tags_software_select()
+
+    def tags_list_text(self, record):
+        return f"[{record.id}] {record.name} - {', '.join(record.tags)}"
 
     def refresh_tags_ui(self):
         self.tags_software_list.delete(0, tk.END)
-        software_list = self.get_software_list()
-        for sw in software_list:
-            tags = self.get_tags_for_software(sw[0])
-            self.tags_software_list.insert(tk.END, f"[{sw[0]}] {sw[1]} - {', '.join(tags)}")
+        self.tags_software_list.insert(tk.END, *[self.tags_list_text(record) for record in self.catalog])
 
-        self.delete_tag_combo["values"] = self.get_all_tags()
+        self.refresh_tag_choices()
+
+    def refresh_tag_choices(self):
+        self.delete_tag_combo["values"] = self.catalog.tags
         if self.delete_tag_combo["values"]:
             self.delete_tag_combo.current(0)
 
         self.update_tags_buttons()
 
+    def on_catalog_tags_list_changed(self, event, ids):
+        if event == "reset":
+            self.refresh_tags_ui()
+            return
+
+        # 列表行顺序与 catalog.order 一致，按 row_index 定位后只替换受影响的行
+        selected = self.tags_software_list.curselection()
+        for software_id in ids:
+            record = self.catalog.get(software_id)
+            i = self.catalog.row_index.get(software_id)
+            if record is None or i is None:
+                continue
+            if i < self.tags_software_list.size():
+                self.tags_software_list.delete(i)
+            self.tags_software_list.insert(i, self.tags_list_text(record))
+        for i in selected:
+            self.tags_software_list.selection_set(i)
+
+        if event == "tags":
+            self.refresh_tag_choices()
+
     def on_tags_software_select(self, event=None):
         selected_indices = self.tags_software_list.curselection()
         if not selected_indices:
@@ -594,18 +1914,14 @@ class SoftwareManager:
             return
 
         index = selected_indices[0]
-        item = self.tags_software_list.get(index)
-        try:
-            software_id = int(item.split("]")[0][1:])
-        except Exception:
-            software_id = None
+        record = self.catalog.get(self.catalog.order[index]) if index < len(self.catalog.order) else None
+        software_id = record.id if record else None
 
         self.current_software_id = software_id
 
-        if software_id is not None:
-            tags = self.get_tags_for_software(software_id)
-            self.selected_tags = set(tags)
-            self.current_tags_var.set(", ".join(tags) if tags else "无")
+        if record is not None:
+            self.selected_tags = set(record.tags)
+            self.current_tags_var.set(", ".join(record.tags) if record.tags else "无")
         else:
             self.selected_tags = set()
             self.current_tags_var.set("无")
@@ -616,7 +1932,7 @@ class SoftwareManager:
         for widget in self.tags_buttons_frame.winfo_children():
             widget.destroy()
 
-        for tag in self.get_all_tags():
+        for tag in self.catalog.tags:
             is_selected = tag in self.selected_tags
             style = ttk.Style()
             style_name = f"{tag}.TButton"
@@ -645,27 +1961,12 @@ class SoftwareManager:
             messagebox.showwarning("警告", "标签名称不能为空")
             return
 
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
         try:
-            cursor.execute("INSERT INTO tags (name) VALUES (?)", (new_tag,))
-            conn.commit()
+            self.catalog.add_tag(new_tag)
             self.new_tag_var.set("")
-            self.all_tags = self.get_all_tags()
-            self.refresh_tags_ui()
-
-            if new_tag not in self.tag_vars:
-                var = tk.BooleanVar(value=False)
-                cb = ttk.Checkbutton(self.tag_filter_frame, text=new_tag, variable=var, command=self.refresh_software_list)
-                cb.pack(side=tk.LEFT, padx=4, pady=5)
-                self.tag_vars[new_tag] = var
-
             self.update_status(f"已添加标签: {new_tag}")
         except sqlite3.IntegrityError:
             messagebox.showwarning("警告", f"标签 '{new_tag}' 已存在")
-        finally:
-            conn.close()
 
     def delete_tag(self):
         tag = self.delete_tag_var.get()
@@ -675,69 +1976,74 @@ class SoftwareManager:
         if not messagebox.askyesno("确认删除", f"确定要删除标签 '{tag}' 吗？\n此操作无法撤销。"):
             return
 
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        cursor.execute("SELECT id FROM tags WHERE name=?", (tag,))
-        res = cursor.fetchone()
-        if res is None:
+        if not self.catalog.delete_tag(tag):
             messagebox.showerror("错误", "标签不存在")
-            conn.close()
             return
 
-        tag_id = res[0]
-
-        cursor.execute("DELETE FROM software_tags WHERE tag_id=?", (tag_id,))
-        cursor.execute("DELETE FROM tags WHERE id=?", (tag_id,))
-
-        conn.commit()
-        conn.close()
-
-        self.all_tags = self.get_all_tags()
-        self.refresh_tags_ui()
-
-        if tag in self.tag_vars:
-            var = self.tag_vars[tag]
-            var.set(False)
-            for child in self.tag_filter_frame.winfo_children():
-                if isinstance(child, ttk.Checkbutton) and child.cget("text") == tag:
-                    child.destroy()
-                    break
-            del self.tag_vars[tag]
-
-        self.refresh_software_list()
         self.update_status(f"已删除标签: {tag}")
 
     def save_tags_changes(self):
         if not self.current_software_id:
             return
 
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
         try:
-            cursor.execute("DELETE FROM software_tags WHERE software_id=?", (self.current_software_id,))
-            for tag in self.selected_tags:
-                cursor.execute("SELECT id FROM tags WHERE name=?", (tag,))
-                res = cursor.fetchone()
-                if res:
-                    tag_id = res[0]
-                    cursor.execute("INSERT INTO software_tags (software_id, tag_id) VALUES (?, ?)",
-                                  (self.current_software_id, tag_id))
-            conn.commit()
-            self.refresh_tags_ui()
-            self.refresh_software_list()
+            self.catalog.set_software_tags(self.current_software_id, self.selected_tags)
             self.update_status("已更新标签")
         except Exception as e:
             messagebox.showerror("错误", f"保存失败:\n{str(e)}")
-        finally:
-            conn.close()
 
     def update_status(self, message):
         self.status_var.set(f"状态: {message} | 程序路径: {self.usb_drive}")
 
 
+def positive_int(value):
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError("必须是大于 0 的整数")
+    return number
+
+
+def run_sync_command(args):
+    source_root = os.path.dirname(os.path.abspath(sys.argv[0]))
+    if not os.path.isdir(args.sync):
+        print(f"目标目录不存在: {args.sync}", file=sys.stderr)
+        return 2
+    if is_same_directory(args.sync, source_root):
+        print("目标目录不能是当前软件库", file=sys.stderr)
+        return 2
+    last_print = [0.0]
+
+    def on_progress(done, total, rel):
+        now = time.perf_counter()
+        if now - last_print[0] >= 1 or done == total:
+            last_print[0] = now
+            print(f"\r{done * 100 / total if total else 100:5.1f}%  {rel[:60]:<60}", end="", flush=True)
+
+    sync = LibrarySync(source_root, args.sync, with_hash=args.hash, delete_extraneous=args.delete,
+                       merge=not args.no_merge, workers=args.workers, progress=on_progress)
+    try:
+        report = sync.run()
+    except KeyboardInterrupt:
+        sync.cancel()
+        print("\n同步已中断，再次同步将从中断处继续")
+        return 1
+    print()
+    print(report.summary())
+    return 1 if report.cancelled else 0
+
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="U盘软件库管理器")
+    parser.add_argument("--sync", metavar="目标目录", help="将本软件库增量同步到目标U盘目录后退出")
+    parser.add_argument("--hash", action="store_true", help="同步时比较文件哈希")
+    parser.add_argument("--delete", action="store_true", help="同步时删除目标中多余的软件文件")
+    parser.add_argument("--no-merge", action="store_true", help="同步时不合并软件信息")
+    parser.add_argument("--workers", type=positive_int, default=4, help="并行复制的线程数")
+    args = parser.parse_args()
+
+    if args.sync:
+        sys.exit(run_sync_command(args))
+
     root = tk.Tk()
     app = SoftwareManager(root)
     root.mainloop()
\ No newline at end of file
@@ -0,0 +1,197 @@
+"""目录模型基准测试：5 万条软件记录的内存占用与视图更新延迟
+
+视图更新先用 Python 列表代替列表框，只计模型本身的耗时；有图形显示环境时
+再用真实的 Treeview 和 Listbox 执行主窗口的刷新代码，计入控件的耗时。
+
+用法: python benchmarks/bench_catalog.py [条目数]
+"""
+import os
+import sys
+import sqlite3
+import tempfile
+import time
+import tkinter as tk
+import tracemalloc
+from tkinter import ttk
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from SoftwareManager import CatalogModel, SoftwareManager, create_database  # noqa: E402
+
+TAGS = ["必备", "驱动", "办公", "浏览器", "工具", "安全", "系统", "影音", "开发", "网络"]
+
+
+def create_test_database(db_path, count):
+    create_database(db_path)
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM tags")
+    cursor.executemany("INSERT INTO tags (id, name) VALUES (?, ?)", list(enumerate(TAGS, 1)))
+    cursor.executemany(
+        "INSERT INTO software (id, name, filename, path, description) VALUES (?, ?, ?, ?, ?)",
+        ((i, f"软件{i}", f"tool_{i}.exe", f"tool_{i}.exe", f"第 {i} 个测试软件的功能描述") for i in range(1, count + 1))
+    )
+    cursor.executemany(
+        "INSERT INTO software_tags (software_id, tag_id) VALUES (?, ?)",
+        ((i, tag_id) for i in range(1, count + 1) for tag_id in {i % len(TAGS) + 1, i % 3 + 1})
+    )
+    conn.commit()
+    conn.close()
+
+
+class ListView:
+    """模拟标签页列表框：按 row_index 只替换受影响的行，不含控件本身的耗时"""
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self.rows = []
+        catalog.subscribe(self.on_changed)
+
+    def on_changed(self, event, ids):
+        if event == "reset":
+            self.rows = [self.text(record) for record in self.catalog]
+            return
+        for software_id in ids:
+            i = self.catalog.row_index[software_id]
+            text = self.text(self.catalog.get(software_id))
+            if i < len(self.rows):
+                self.rows[i] = text
+            else:
+                self.rows.append(text)
+
+    @staticmethod
+    def text(record):
+        return f"[{record.id}] {record.name} - {', '.join(record.tags)}"
+
+
+class WidgetView(SoftwareManager):
+    """只创建软件列表和标签页列表两个控件，刷新沿用主窗口的代码"""
+
+    def __init__(self, root, catalog):
+        self.root = root
+        self.catalog = catalog
+        self.sort_ascending = True
+        self.search_var = tk.StringVar(root)
+        self.tag_vars = {}
+
+        self.tree = ttk.Treeview(root, columns=("name", "description", "tags"), show="headings", selectmode="browse")
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.tags_software_list = tk.Listbox(root, selectmode=tk.SINGLE)
+        self.tags_software_list.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
+
+        catalog.subscribe(self.on_catalog_tree_changed)
+        catalog.subscribe(self.on_catalog_tags_list_changed)
+        self.refresh_tags_ui()
+        self.refresh_software_list()
+
+    def update_status(self, message):
+        pass
+
+    def clear_selection_detail(self):
+        pass
+
+    def refresh_tag_choices(self):
+        pass
+
+
+def create_root():
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        return None
+    root.geometry("820x600")
+    return root
+
+
+def timed(func, repeat):
+    start = time.perf_counter()
+    for i in range(repeat):
+        func(i)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "software.db")
+        create_test_database(db_path, count)
+
+        catalog = CatalogModel(db_path)
+        start = time.perf_counter()
+        catalog.load()
+        load_ms = (time.perf_counter() - start) * 1000
+
+        # 之后启动时拼音键已缓存在数据库中，刷新列表时沿用已有的搜索索引
+        start = time.perf_counter()
+        CatalogModel(db_path).load()
+        cached_load_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        catalog.load()
+        reload_ms = (time.perf_counter() - start) * 1000
+
+        tracemalloc.start()
+        measured = CatalogModel(db_path)
+        measured.load()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del measured
+
+        view = ListView(catalog)
+        catalog.load()
+
+        ids = catalog.order
+        update_ms = timed(lambda i: catalog.update_software(ids[i * 97 % count], f"软件{i}", "新的描述"), 200)
+        tags_ms = timed(lambda i: catalog.set_software_tags(ids[i * 89 % count], TAGS[i % 4:i % 4 + 2]), 200)
+        search_ms = timed(lambda i: catalog.filter(str(i * 7 % count)), 20)
+        tag_filter_ms = timed(lambda i: catalog.filter("", [TAGS[i % len(TAGS)]]), 20)
+        lookup_ms = timed(lambda i: catalog.row_index[ids[i * 31 % count]], 10000)
+
+        assert view.rows[catalog.row_index[ids[0]]] == ListView.text(catalog.get(ids[0]))
+
+        print(f"条目数:             {count}")
+        print(f"首次加载:           {load_ms:.1f} ms (计算拼音键)")
+        print(f"启动加载:           {cached_load_ms:.1f} ms (拼音键已缓存)")
+        print(f"刷新列表:           {reload_ms:.1f} ms (目录无变化)")
+        print(f"模型内存:           {current / 1024 / 1024:.1f} MiB (峰值 {peak / 1024 / 1024:.1f} MiB)")
+        print(f"每条记录:           {current / count:.0f} 字节")
+        print(f"编辑并更新视图:     {update_ms:.3f} ms/次 (含 SQLite 提交)")
+        print(f"修改标签并更新视图: {tags_ms:.3f} ms/次 (含 SQLite 提交)")
+        print(f"关键词过滤:         {search_ms:.2f} ms/次")
+        print(f"标签过滤:           {tag_filter_ms:.2f} ms/次")
+        print(f"定位列表行:         {lookup_ms * 1000:.3f} µs/次")
+
+        root = create_root()
+        if root is None:
+            print("控件耗时:           跳过（没有图形显示环境）")
+            return
+
+        widgets = WidgetView(root, catalog)
+
+        def drawn(func):
+            def run(i):
+                func(i)
+                root.update_idletasks()
+            return run
+
+        def search(i):
+            widgets.search_var.set(str(i * 7 % count))
+            widgets.refresh_software_list()
+
+        rebuild_ms = timed(drawn(lambda i: widgets.refresh_software_list()), 5)
+        keystroke_ms = timed(drawn(search), 10)
+        widgets.search_var.set("")
+        rename_ms = timed(drawn(lambda i: catalog.update_software(ids[i * 97 % count], f"软件{i}", "新的描述")), 5)
+        retag_ms = timed(drawn(lambda i: catalog.set_software_tags(ids[i * 89 % count], TAGS[i % 4:i % 4 + 2])), 200)
+        tags_list_ms = timed(drawn(lambda i: widgets.refresh_tags_ui()), 5)
+        root.destroy()
+
+        print(f"重建软件列表:       {rebuild_ms:.1f} ms/次 (Treeview 删除并重新插入全部行)")
+        print(f"搜索一次按键:       {keystroke_ms:.1f} ms/次 (过滤并重建 Treeview)")
+        print(f"改名并更新控件:     {rename_ms:.1f} ms/次 (名称影响排序，Treeview 重建)")
+        print(f"修改标签并更新控件: {retag_ms:.3f} ms/次 (Treeview 与 Listbox 各替换一行)")
+        print(f"重建标签页列表:     {tags_list_ms:.1f} ms/次 (Listbox 删除并重新插入全部行)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""搜索引擎基准测试：5 万条软件记录的索引构建与查询延迟
+
+用法: python benchmarks/bench_search.py [条目数]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from SoftwareManager import PINYIN_BACKEND, CatalogModel, SearchIndex, create_database  # noqa: E402
+
+CHARS = "微信安全卫士浏览器音乐视频播放下载工具驱动精灵输入法办公文档压缩解压截图录屏翻译词典网盘邮件杀毒系统优化清理备份恢复分区磁盘编辑图片相机游戏助手管理大师"
+WORDS = ["Chrome", "Office", "Player", "Tools", "Pro", "Lite", "Portable", "Setup", "X64", "2024"]
+KNOWN = ["微信", "腾讯QQ", "360安全卫士", "Google Chrome浏览器", "网易云音乐", "搜狗输入法", "WPS Office", "驱动精灵"]
+QUERIES = ["wx", "weixin", "微信", "weixn", "360", "chrome", "浏览器", "llq", "sgsrf", "音乐播放", "工具", "q"]
+TYPO_QUERIES = ["微兴", "wexin", "weixni", "chorme", "crhome", "搜购输入法", "sgsfr", "驱动经灵", "wpsofice"]
+
+
+def random_name(rng):
+    name = "".join(rng.choice(CHARS) for _ in range(rng.randint(2, 5)))
+    if rng.random() < 0.3:
+        name += " " + rng.choice(WORDS)
+    return name
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    rng = random.Random(42)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "software.db")
+        create_database(db_path)
+        catalog = CatalogModel(db_path)
+        catalog.load()
+
+        rows = [(name, f"{i}.exe", f"{i}.exe", "") for i, name in enumerate(KNOWN)]
+        rows += [(random_name(rng), f"sw_{i}.exe", f"sw_{i}.exe",
+                  "".join(rng.choice(CHARS) for _ in range(rng.randint(0, 12))))
+                 for i in range(count - len(KNOWN))]
+
+        start = time.perf_counter()
+        catalog.add_software_batch(rows)
+        add_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        catalog = CatalogModel(db_path)
+        catalog.load()
+        cached_load_ms = (time.perf_counter() - start) * 1000
+
+        tracemalloc.start()
+        index = SearchIndex()
+        for software_id, keys in catalog.search_index.keys.items():
+            index.add(software_id, keys)
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del index
+
+        ids = catalog.order
+        start = time.perf_counter()
+        for i in range(200):
+            software_id = ids[len(KNOWN) + i * 131 % (count - len(KNOWN))]
+            catalog.update_software(software_id, random_name(rng), "")
+        update_ms = (time.perf_counter() - start) / 200 * 1000
+
+        print(f"条目数:               {count}")
+        print(f"拼音后端:             {PINYIN_BACKEND}")
+        print(f"首次入库并建立索引:   {add_ms:.0f} ms")
+        print(f"加载（拼音键已缓存）: {cached_load_ms:.0f} ms")
+        print(f"索引内存:             {current / 1024 / 1024:.1f} MiB, {len(catalog.search_index.postings)} 个 n-gram")
+        print(f"编辑并增量更新索引:   {update_ms:.3f} ms/次 (含 SQLite 提交)")
+        print()
+        print(f"{'查询':<12}{'结果数':>8}{'耗时 ms':>10}  首个结果")
+        for query in QUERIES:
+            start = time.perf_counter()
+            for _ in range(5):
+                result = catalog.filter(query)
+            elapsed = (time.perf_counter() - start) / 5 * 1000
+            first = result[0].name if result else "-"
+            print(f"{query:<12}{len(result):>8}{elapsed:>10.2f}  {first}")
+
+        print()
+        print(f"{'输错的查询':<10}{'结果数':>8}{'耗时 ms':>10}  目标排名")
+        for query in TYPO_QUERIES:
+            start = time.perf_counter()
+            for _ in range(5):
+                result = catalog.filter(query)
+            elapsed = (time.perf_counter() - start) / 5 * 1000
+            names = [record.name for record in result]
+            rank = next((f"{i + 1} ({name})" for i, name in enumerate(names) if name in KNOWN), "-")
+            print(f"{query:<12}{len(result):>8}{elapsed:>10.2f}  {rank}")
+
+
+if __name__ == "__main__":
+    main()